@@ -1,20 +1,62 @@
+import time
+
+STARTUP_T0 = time.perf_counter() #startup trace times are measured from here (before pygame is even imported)
+
 import pygame
 import sys
 import os
+import gc
+import threading
+import traceback
+import weakref
+import telemetry
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
 from random import randint
+from typing import NamedTuple
 from pygame import PixelArray, Surface, Rect
 from pygame.math import Vector2
 
 #TODO fix player class & spider class reassigning asset to actual instance of class :o
 
-pygame.init()
-pygame.mixer.init()
+STARTUP_TRACE = '--startup-trace' in sys.argv #print a per-step startup timeline once the first game frame is up
+
+class StartupTrace:
+    """
+    timeline of startup steps (ms since STARTUP_T0)
+    """
+
+    steps = []
+
+    def __init__(self) -> None:
+        self.steps = []
+
+    def step(self, name) -> None:
+        self.steps.append((name, (time.perf_counter() - STARTUP_T0) * 1000))
+
+    def report(self) -> None:
+        last = 0
+        for name, t in self.steps:
+            print("[startup] {T:8.2f}ms (+{D:7.2f}ms) {N}".format(T = t, D = t - last, N = name))
+            last = t
+
+startup = StartupTrace()
+startup.step('import pygame')
+
+# --- Display ---
+
+#only the display is needed for the first frame; everything else is initialized after it's up
+pygame.display.init()
 
 DISPLAY_SIZE = (400, 500)
 DISPLAY = pygame.display.set_mode(DISPLAY_SIZE)
-CLOCK = pygame.time.Clock()
+
+pygame.display.set_caption('The Spyder')
+
+DISPLAY.fill((0, 0, 0))
+pygame.display.update()
+startup.step('first frame')
 
 def print_warning(n = "?"):
     """
@@ -23,19 +65,42 @@ def print_warning(n = "?"):
 
     print("{S} {N}".format(S = "[!]", N = n))
 
-def import_image(filepath: str, scale = 1) -> Surface:
+def read_image(filepath: str, scale = 1) -> Surface:
     """
-    imports an image as surface and applies a scale to it if specified.
+    reads an image and applies a scale to it if specified, without converting it (safe to run off the main thread).
     """
-    
+
     if not os.path.exists(filepath):
         print_warning("image {F} not found!".format(F = filepath))
         return None
 
-    img = pygame.image.load(filepath).convert_alpha()
+    img = pygame.image.load(filepath)
 
     return pygame.transform.scale(img, (img.get_width() * scale, img.get_height() * scale))
 
+def convert_image(img: Surface, alpha = None, name = '?', static = True) -> Surface:
+    """
+    converts a read image to the display's format (main thread only!), sets its alpha if specified and tracks it in the surface registry.
+    static should be False for images that get drawn onto or transformed (see optimize_surface)
+    """
+
+    if img == None:
+        return None
+
+    img = img.convert_alpha()
+
+    if alpha != None:
+        img.set_alpha(alpha)
+
+    return surface_registry.track(img, name, static)
+
+def import_image(filepath: str, scale = 1) -> Surface:
+    """
+    imports an image as surface and applies a scale to it if specified.
+    """
+
+    return convert_image(read_image(filepath, scale), name = filepath)
+
 def lerp(a = 0, b = 0, t = 0.125):
     """
     lerps without the need to use a vector2
@@ -43,43 +108,325 @@ def lerp(a = 0, b = 0, t = 0.125):
 
     return a + (t - 0) * (b - a) / (1 - 0)
 
+# --- Surfaces ---
+
+OPTIMIZE_SURFACES = '--optimize-surfaces' in sys.argv #convert tracked surfaces to the cheapest format they allow
+
+SURFACE_KEY = (255, 0, 255) #colorkey used when turning on/off alpha surfaces into colorkeyed ones
+
+def has_pixel_alpha(surface: Surface) -> bool:
+    """
+    whether a surface has an actual alpha channel (NOTE SRCALPHA is also set on surfaces with only surface-wide alpha)
+    """
+
+    return surface.get_masks()[3] != 0
+
+def optimize_surface(surface: Surface, static = True) -> Surface:
+    """
+    converts a surface (main thread only!) to the cheapest format its pixels allow:
+    fully opaque -> convert(), already colorkeyed or on/off alpha -> colorkeyed convert(), anything else stays per-pixel alpha.
+    colorkeyed static surfaces also get RLEACCEL; static means it's only ever blitted from, RLE surfaces are slow to draw onto or transform!
+    """
+
+    rle = pygame.RLEACCEL if static else 0
+
+    #surface-wide alpha (i.e. shadows) has to be carried over to the converted surface
+    alpha = surface.get_alpha()
+    if alpha == 255:
+        alpha = None
+
+    w, h = surface.get_size()
+    colorkey = surface.get_colorkey()
+
+    if colorkey != None:
+        optimized = surface.convert()
+        optimized.set_colorkey(colorkey, rle)
+
+    elif not has_pixel_alpha(surface):
+        optimized = surface.convert()
+
+    else:
+        opaque = pygame.mask.from_surface(surface, 254) #pixels with alpha 255
+        visible = pygame.mask.from_surface(surface, 0) #pixels with alpha > 0
+
+        if opaque.count() == w * h:
+            optimized = surface.convert()
+
+        elif opaque.count() == visible.count():
+            #on/off alpha: paint the transparent pixels with the key color and colorkey them out
+            optimized = surface.convert()
+
+            visible.invert()
+            visible.to_surface(optimized, setcolor = SURFACE_KEY, unsetcolor = None)
+
+            #give up if the key color is also used by the image itself
+            if pygame.mask.from_threshold(optimized, SURFACE_KEY, (1, 1, 1, 255)).count() != visible.count():
+                return surface
+
+            optimized.set_colorkey(SURFACE_KEY, rle)
+
+        else:
+            return surface
+
+    if alpha != None:
+        optimized.set_alpha(alpha)
+
+    return optimized
+
+def describe_surface(surface: Surface) -> str:
+    """
+    blit-relevant flags of a surface, cheapest first
+    """
+
+    flags = []
+
+    if surface.get_flags() & pygame.RLEACCEL:
+        flags.append('RLE')
+
+    if surface.get_colorkey() != None:
+        flags.append('colorkey')
+
+    if has_pixel_alpha(surface):
+        flags.append('pixel alpha')
+
+    alpha = surface.get_alpha()
+    if alpha != None and alpha != 255:
+        flags.append('surface alpha {A}'.format(A = alpha))
+
+    return ', '.join(flags) if len(flags) != 0 else 'opaque'
+
+class SurfaceRegistry:
+    """
+    keeps (weak) track of every loaded & derived surface so their memory & formats can be reported on demand (F3 in game).
+    with optimize on, surfaces go through optimize_surface as they're tracked.
+    surfaces that only live for the frame they're made in (rotations, text rendered every frame) are only counted, per frame
+    """
+
+    optimize = False
+
+    #transient surfaces made during the last finished frame
+    transient_count = 0
+    transient_bytes = 0
+
+    __surfaces = None
+
+    __frame_count = 0
+    __frame_bytes = 0
+
+    def __init__(self, optimize = False) -> None:
+        self.optimize = optimize
+        self.__surfaces = weakref.WeakKeyDictionary() #surface: name, entries go away with their surfaces
+
+    def track(self, surface: Surface, name = '?', static = True) -> Surface:
+        """
+        registers a surface and returns it, or its optimized version if optimizing (use the returned one!)
+        """
+
+        if surface == None:
+            return None
+
+        if self.optimize:
+            surface = optimize_surface(surface, static)
+
+        self.__surfaces[surface] = name
+        return surface
+
+    def transient(self, surface: Surface) -> Surface:
+        """
+        counts a surface made just for this frame and returns it (it isn't optimized or kept track of)
+        """
+
+        self.__frame_count += 1
+        self.__frame_bytes += surface.get_pitch() * surface.get_height()
+        return surface
+
+    def end_frame(self) -> None:
+        self.transient_count = self.__frame_count
+        self.transient_bytes = self.__frame_bytes
+
+        self.__frame_count = 0
+        self.__frame_bytes = 0
+
+    def report(self) -> None:
+        total = 0
+        alpha_total = 0
+        rle_count = 0
+
+        print("[surfaces] {N:<24}{S:>10}{B:>5}{K:>9}  {F}".format(N = 'name', S = 'size', B = 'bpp', K = 'KiB', F = 'flags'))
+
+        for surface, name in sorted(self.__surfaces.items(), key = lambda item: item[1]):
+            size = surface.get_pitch() * surface.get_height()
+
+            total += size
+            if has_pixel_alpha(surface):
+                alpha_total += size
+            if surface.get_flags() & pygame.RLEACCEL:
+                rle_count += 1
+
+            print("[surfaces] {N:<24}{S:>10}{B:>5}{K:>9.1f}  {F}".format(
+                N = name,
+                S = '{W}x{H}'.format(W = surface.get_width(), H = surface.get_height()),
+                B = surface.get_bitsize(),
+                K = size / 1024,
+                F = describe_surface(surface)
+            ))
+
+        print("[surfaces] total: {N} surfaces, {T:.1f} KiB ({A:.1f} KiB per-pixel alpha), {R} RLE".format(
+            N = len(self.__surfaces),
+            T = total / 1024,
+            A = alpha_total / 1024,
+            R = rle_count
+        ))
+        print("[surfaces] last frame: {N} transient surfaces, {T:.1f} KiB".format(
+            N = self.transient_count,
+            T = self.transient_bytes / 1024
+        ))
+
+surface_registry = SurfaceRegistry(optimize = OPTIMIZE_SURFACES)
+
 # --- Asset Importing --- 
 
-player = import_image('assets/player.png', 3)
-police = import_image('assets/police.png', 3)
-car_g = import_image('assets/car_g.png', 3)
-car_o = import_image('assets/car_o.png', 3)
-car_r = import_image('assets/car_r.png', 3)
-car_y = import_image('assets/car_y.png', 3)
-road = import_image('assets/road.png', 4)
-shadow = import_image('assets/shadow.png', 3)
-logo = import_image('assets/logo.png')
-game_over = import_image('assets/game_over.png')
-panel = import_image('assets/panel.png')
-new_best = import_image('assets/new_best.png')
-m_bronze = import_image('assets/m_bronze.png', 2)
-m_silver = import_image('assets/m_silver.png', 2)
-m_gold = import_image('assets/m_gold.png', 2)
-m_plat = import_image('assets/m_plat.png', 2)
-m_shadow = import_image('assets/m_shadow.png', 2)
-spider = import_image('assets/spider.png', 5)
-
-font = pygame.font.Font('assets/font.ttf', 32) #big version of font
-font_s = pygame.font.Font('assets/font.ttf', 16) #small version of font
-font_xs = pygame.font.Font('assets/font.ttf', 8) #xtra small version of font
-
-p_switch = pygame.mixer.Sound('assets/switch.wav')
-p_crash = pygame.mixer.Sound('assets/crash.wav')
-s_peek = pygame.mixer.Sound('assets/peek.wav')
-s_attack = pygame.mixer.Sound('assets/attack.wav')
-s_hide = pygame.mixer.Sound('assets/hide.wav')
-
-m_shadow.set_alpha(50)
-shadow.set_alpha(50)
+ASSET_POOL = ThreadPoolExecutor(max_workers = 4, thread_name_prefix = 'assets')
+
+def submit_assets(jobs: dict) -> dict:
+    """
+    submits asset loading jobs (name: (load function, *args)) to the asset pool, returns their futures by name
+    """
+
+    return {name: ASSET_POOL.submit(job[0], *job[1:]) for name, job in jobs.items()}
+
+def wait_assets(futures: dict, progress = None) -> dict:
+    """
+    waits on submitted asset futures, calling progress(done, total) on the main thread as each one finishes
+    """
+
+    assets = {}
+    total = len(futures)
+
+    by_future = {future: name for name, future in futures.items()}
+    for done, future in enumerate(as_completed(by_future), 1):
+        assets[by_future[future]] = future.result()
+
+        if progress != None:
+            progress(done, total)
+
+    return assets
+
+def draw_loading(done, total) -> None:
+    """
+    loading bar progress callback; also keeps the window responsive while we wait
+    """
+
+    pygame.event.pump()
+
+    bar = Rect(0, 0, DISPLAY_SIZE[0] - 100, 10)
+    bar.center = (DISPLAY_SIZE[0] / 2, DISPLAY_SIZE[1] / 2)
+
+    fill = bar.copy()
+    fill.width = round(bar.width * done / total)
+
+    DISPLAY.fill((0, 0, 0))
+    pygame.draw.rect(DISPLAY, (50, 50, 50), bar)
+    pygame.draw.rect(DISPLAY, (197, 197, 197), fill)
+    pygame.display.update()
+
+class LazyAsset:
+    """
+    asset that isn't loaded at startup; it's loaded on the asset pool once prefetched or first asked for.
+    finish runs on the main thread over the loaded result (i.e. converting images)
+    """
+
+    __asset = None
+    __future = None
+
+    def __init__(self, load, *args, finish = None) -> None:
+        self.__load = load
+        self.__args = args
+        self.__finish = finish
+
+    def prefetch(self) -> None:
+        if self.__future == None:
+            self.__future = ASSET_POOL.submit(self.__load, *self.__args)
+
+    def get(self):
+        if self.__asset == None:
+            self.prefetch()
+
+            asset = self.__future.result() #NOTE blocks only if it hasn't finished loading yet
+            self.__asset = self.__finish(asset) if self.__finish != None else asset
+
+        return self.__asset
+
+#images can start loading right away, they don't need any other subsystem
+image_futures = submit_assets({
+    'player': (read_image, 'assets/player.png', 3),
+    'police': (read_image, 'assets/police.png', 3),
+    'car_g': (read_image, 'assets/car_g.png', 3),
+    'car_o': (read_image, 'assets/car_o.png', 3),
+    'car_r': (read_image, 'assets/car_r.png', 3),
+    'car_y': (read_image, 'assets/car_y.png', 3),
+    'road': (read_image, 'assets/road.png', 4),
+    'shadow': (read_image, 'assets/shadow.png', 3),
+    'logo': (read_image, 'assets/logo.png'),
+    'spider': (read_image, 'assets/spider.png', 5),
+})
+
+#meanwhile bring up the other subsystems
+pygame.font.init()
+startup.step('font init')
+
+pygame.mixer.init()
+startup.step('mixer init')
+
+other_futures = submit_assets({
+    'font': (pygame.font.Font, 'assets/font.ttf', 32), #big version of font
+    'font_s': (pygame.font.Font, 'assets/font.ttf', 16), #small version of font
+    'font_xs': (pygame.font.Font, 'assets/font.ttf', 8), #xtra small version of font
+    'p_switch': (pygame.mixer.Sound, 'assets/switch.wav'),
+    'p_crash': (pygame.mixer.Sound, 'assets/crash.wav'),
+})
+
+assets = wait_assets({**image_futures, **other_futures}, draw_loading)
+startup.step('core assets loaded')
+
+player = convert_image(assets['player'], name = 'player', static = False) #NOTE rotated every frame
+police = convert_image(assets['police'], name = 'police')
+car_g = convert_image(assets['car_g'], name = 'car_g')
+car_o = convert_image(assets['car_o'], name = 'car_o')
+car_r = convert_image(assets['car_r'], name = 'car_r')
+car_y = convert_image(assets['car_y'], name = 'car_y')
+road = convert_image(assets['road'], name = 'road')
+shadow = convert_image(assets['shadow'], 50, name = 'shadow', static = False) #NOTE rotated every frame (player shadow)
+logo = convert_image(assets['logo'], name = 'logo')
+spider = convert_image(assets['spider'], name = 'spider')
+
+font = assets['font']
+font_s = assets['font_s']
+font_xs = assets['font_xs']
+
+p_switch = assets['p_switch']
+p_crash = assets['p_crash']
+
+startup.step('core assets converted')
+
+#rarely used assets (game over screen, medals, spider sounds) are only loaded once a game starts
+game_over = LazyAsset(read_image, 'assets/game_over.png', finish = lambda img: convert_image(img, name = 'game_over'))
+panel = LazyAsset(read_image, 'assets/panel.png', finish = lambda img: convert_image(img, name = 'panel', static = False)) #NOTE copied & drawn onto when the game over panel is composited
+new_best = LazyAsset(read_image, 'assets/new_best.png', finish = lambda img: convert_image(img, name = 'new_best'))
+m_bronze = LazyAsset(read_image, 'assets/m_bronze.png', 2, finish = lambda img: convert_image(img, name = 'm_bronze'))
+m_silver = LazyAsset(read_image, 'assets/m_silver.png', 2, finish = lambda img: convert_image(img, name = 'm_silver'))
+m_gold = LazyAsset(read_image, 'assets/m_gold.png', 2, finish = lambda img: convert_image(img, name = 'm_gold'))
+m_plat = LazyAsset(read_image, 'assets/m_plat.png', 2, finish = lambda img: convert_image(img, name = 'm_plat'))
+m_shadow = LazyAsset(read_image, 'assets/m_shadow.png', 2, finish = lambda img: convert_image(img, 50, name = 'm_shadow'))
+
+s_peek = LazyAsset(pygame.mixer.Sound, 'assets/peek.wav')
+s_attack = LazyAsset(pygame.mixer.Sound, 'assets/attack.wav')
+s_hide = LazyAsset(pygame.mixer.Sound, 'assets/hide.wav')
+
+lazy_assets = (game_over, panel, new_best, m_bronze, m_silver, m_gold, m_plat, m_shadow, s_peek, s_attack, s_hide)
 
 # --- Secondary Initialization ----
 
-pygame.display.set_caption('The Spyder')
 pygame.display.set_icon(logo)
 
 # --- Game Control ---
@@ -129,6 +476,213 @@ speed_incr = 60 #speed increased per speed tick
 speed_ticks = 15 #amt of ticks before speed tick
 speed_ticks_t = speed_ticks #temp current tick goal for speed incr
 
+# --- Frame Timing & GC ---
+
+GC_SCHEDULE = '--gc-schedule' in sys.argv #turn automatic gc off while GAME_ON and run collections in frame slack instead
+FRAME_STATS = '--frame-stats' in sys.argv #print frame times & gc pauses on every game over
+
+gc_frame_budget = 1 / 60 #frame time (secs) we try to fit young collections inside of
+gc_slack_min = 0.002 #min slack (secs) a frame must have left for a young collection to be scheduled in it
+gc_young_limit = gc.get_threshold()[0] * 10 #past this many young allocations we collect even without slack so memory stays bounded
+
+def percentile(values, p = 99):
+    """
+    nearest-rank percentile of a list of values
+    """
+
+    if len(values) == 0:
+        return 0
+
+    ordered = sorted(values)
+    return ordered[round((p / 100) * (len(ordered) - 1))]
+
+class FrameStats:
+    """
+    records frame times and gc pause durations (both in ms) between reports
+    """
+
+    frame_times = []
+    gc_pauses = []
+    render_counts = [] #(commands, batches, blit area) per frame
+
+    snapshot_ages = [] #time between a snapshot being published and drawn (threaded mode only)
+    dropped = 0 #snapshots published but never drawn
+    duplicated = 0 #render waits (SNAPSHOT_WAIT long) that found no new snapshot, so the last one stayed on screen again
+
+    __gc_start = 0
+    __last_seq = None
+
+    def __init__(self) -> None:
+        self.frame_times = []
+        self.gc_pauses = []
+        self.render_counts = []
+        self.snapshot_ages = []
+
+        #time every collection, scheduled or automatic
+        gc.callbacks.append(self.__on_gc)
+
+    def __on_gc(self, phase, info) -> None:
+        if phase == 'start':
+            self.__gc_start = time.perf_counter()
+        else:
+            self.gc_pauses.append((time.perf_counter() - self.__gc_start) * 1000)
+
+    def add_frame(self, dt, commands = 0, batches = 0, area = 0) -> None:
+        self.frame_times.append(dt * 1000)
+        self.render_counts.append((commands, batches, area))
+
+    def add_snapshot(self, seq, published) -> None:
+        self.snapshot_ages.append((time.perf_counter() - published) * 1000)
+
+        if self.__last_seq != None:
+            self.dropped += seq - self.__last_seq - 1
+
+        self.__last_seq = seq
+
+    def report(self) -> None:
+        print("[frames] n={N} avg={A:.2f}ms p99={P:.2f}ms max={M:.2f}ms".format(
+            N = len(self.frame_times),
+            A = sum(self.frame_times) / max(len(self.frame_times), 1),
+            P = percentile(self.frame_times),
+            M = max(self.frame_times, default = 0)
+        ))
+        print("[gc] n={N} total={T:.2f}ms p99={P:.2f}ms max={M:.2f}ms".format(
+            N = len(self.gc_pauses),
+            T = sum(self.gc_pauses),
+            P = percentile(self.gc_pauses),
+            M = max(self.gc_pauses, default = 0)
+        ))
+
+        n = max(len(self.render_counts), 1)
+        print("[render] avg commands={C:.1f} batches={B:.1f} area={A:.0f}px".format(
+            C = sum(c[0] for c in self.render_counts) / n,
+            B = sum(c[1] for c in self.render_counts) / n,
+            A = sum(c[2] for c in self.render_counts) / n
+        ))
+
+        if len(self.snapshot_ages) != 0:
+            print("[pipeline] snapshot age avg={A:.2f}ms p99={P:.2f}ms dropped={D} duplicated={U}".format(
+                A = sum(self.snapshot_ages) / len(self.snapshot_ages),
+                P = percentile(self.snapshot_ages),
+                D = self.dropped,
+                U = self.duplicated
+            ))
+
+    def clear(self) -> None:
+        self.frame_times.clear()
+        self.gc_pauses.clear()
+        self.render_counts.clear()
+        self.snapshot_ages.clear()
+        self.dropped = 0
+        self.duplicated = 0
+        self.__last_seq = None #NOTE otherwise every step between rounds counts as dropped
+
+frame_stats = FrameStats() if FRAME_STATS else None
+
+def gc_state_change(new_state) -> None:
+    """
+    disables automatic gc while the game is on; any other state gets it back, plus a full collection on game over (nothing moves then, so the pause can't be seen)
+    """
+
+    if new_state == GameState.GAME_ON:
+        gc.disable()
+        return
+
+    gc.enable()
+
+    if new_state == GameState.GAME_OVER:
+        gc.collect()
+
+def gc_schedule_frame(work_time) -> None:
+    """
+    runs a young collection if this frame's work left enough slack in the frame budget (or if too much young garbage piled up)
+    """
+
+    young = gc.get_count()[0]
+
+    if young >= gc_young_limit or (young >= gc.get_threshold()[0] and gc_frame_budget - work_time >= gc_slack_min):
+        gc.collect(0)
+
+# --- Telemetry ---
+
+TELEMETRY = '--telemetry' in sys.argv or '--telemetry-jsonl' in sys.argv #log gameplay events to telemetry/ (binary records unless --telemetry-jsonl)
+
+telemetry_log = telemetry.TelemetryWriter(fmt = 'jsonl' if '--telemetry-jsonl' in sys.argv else 'bin') if TELEMETRY else None
+
+# --- Rendering ---
+
+class Layer(Enum):
+    """
+    draw layers, bottom to top; these follow the old blit order (obstacles, then player, then spider) so overlaps come out the same
+    """
+
+    ROAD = 0
+    OBSTACLE_SHADOW = 1
+    OBSTACLE = 2
+    PLAYER_SHADOW = 3
+    PLAYER_OUTLINE = 4
+    PLAYER = 5
+    SPIDER_OUTLINE = 6
+    SPIDER = 7
+    PANEL = 8
+    TEXT_OUTLINE = 9
+    UI = 10
+
+def texture_id(command):
+    """
+    sort key grouping draw commands by texture
+    """
+
+    return id(command[0])
+
+class RenderQueue:
+    """
+    collects a frame's draw commands and submits them to the display sorted by layer & texture, one DISPLAY.blits call per layer.
+    NOTE draw order within a layer isn't kept, anything that must overlap something else needs its own layer!
+    """
+
+    count_area = False #summing blit area needs the affected rects back from blits, so it's only done when asked for
+
+    #per-frame counters (from the last flush)
+    commands = 0
+    batches = 0
+    area = 0
+
+    __layers = None
+
+    def __init__(self, count_area = False) -> None:
+        self.count_area = count_area
+        self.__layers = [[] for _ in Layer]
+
+    def push(self, layer: Layer, texture: Surface, dest) -> None:
+        self.__layers[layer.value].append((texture, dest))
+
+    def extend(self, layer: Layer, commands) -> None:
+        self.__layers[layer.value].extend(commands)
+
+    def flush(self) -> None:
+        self.commands = 0
+        self.batches = 0
+        self.area = 0
+
+        for batch in self.__layers:
+            if len(batch) == 0:
+                continue
+
+            batch.sort(key = texture_id)
+
+            rects = DISPLAY.blits(batch, doreturn = self.count_area)
+
+            self.commands += len(batch)
+            self.batches += 1
+
+            if self.count_area:
+                self.area += sum(r.width * r.height for r in rects)
+
+            batch.clear()
+
+render_queue = RenderQueue(count_area = FRAME_STATS)
+
 # --- Lanes & Obstacle Spawns ---
 
 lane_spacing = 0.835
@@ -148,36 +702,65 @@ class Direction(Enum):
 # --- UI ---
 
 class GameOverPanel:
-    medal = None #medal img to use
+    """
+    NOTE set() can run on the simulation thread, so it doesn't touch any surfaces; those are only fetched, rendered & laid out in draw()
+    """
+
+    medal: LazyAsset = None #medal img to use
+    text = None #score txt to show
     is_new_best = False
 
+    __loaded = False
+
     __panel_pos = Vector2(DISPLAY_SIZE[0] / 2, 275)
-    __panel_rect = panel.get_rect()
+    __panel_rect: Rect = None
 
-    __medal_local_pos = Vector2(52, panel.get_height() / 2)
-    __medal_rect = m_bronze.get_rect()
+    __medal_local_pos: Vector2 = None
+    __medal_rect: Rect = None
 
-    __text_local_pos = Vector2(__medal_local_pos.x + 148, panel.get_height() / 2)
+    __text_local_pos: Vector2 = None
     __text_surf = None
     __text_rect = None
 
-    __nbest_local_pos = Vector2(__text_local_pos.x, __text_local_pos.y + 35)
-    __nbest_rect = new_best.get_rect()
+    __surf: Surface = None #panel with its contents composited on
+    __composited = None #(text, medal, is_new_best) __surf was composited from
+
+    __nbest_local_pos: Vector2 = None
+    __nbest_rect: Rect = None
     
-    __mshadow_rect = m_shadow.get_rect()
+    __mshadow_rect: Rect = None
+
+    def __load(self):
+        """
+        lays out the panel; its assets are lazy so this waits on them the first time the panel is needed
+        """
+
+        if self.__loaded:
+            return
+
+        #local positions
+        self.__medal_local_pos = Vector2(52, panel.get().get_height() / 2)
+        self.__text_local_pos = Vector2(self.__medal_local_pos.x + 148, panel.get().get_height() / 2)
+        self.__nbest_local_pos = Vector2(self.__text_local_pos.x, self.__text_local_pos.y + 35)
+
+        self.__panel_rect = panel.get().get_rect()
+        self.__medal_rect = m_bronze.get().get_rect()
+        self.__nbest_rect = new_best.get().get_rect()
+        self.__mshadow_rect = m_shadow.get().get_rect()
 
-    def __init__(self):
         #position
         self.__panel_rect.center = self.__panel_pos
         self.__medal_rect.center = self.__medal_local_pos #NOTE local pos refers to local position within panel rect (we blit these to their parent surface rather than the display)
         self.__mshadow_rect.center = self.__medal_local_pos
+        self.__nbest_rect.center = self.__nbest_local_pos
+
+        self.__loaded = True
 
     def set(self):
         #check new best & set
         global high_score
         if high_score == None or score > high_score:
             self.is_new_best = True
-            self.__nbest_rect.center = self.__nbest_local_pos
 
             #write score
             if get_highscore() == None or score > get_highscore(in_int=True):
@@ -199,26 +782,41 @@ class GameOverPanel:
             self.medal = m_plat
 
         #set text
-        self.__text_surf = font_s.render("Score: {s}, Best: {b}".format(s = score, b = high_score), False, (197, 197, 197))
-        self.__text_rect = self.__text_surf.get_rect()
-        self.__text_rect.center = self.__text_local_pos
+        self.text = "Score: {s}, Best: {b}".format(s = score, b = high_score)
 
     def draw(self):
+        self.__load()
+
+        #only composite the panel again when what's on it changed
+        contents = (self.text, self.medal, self.is_new_best)
+        if contents != self.__composited:
+            self.__composited = contents
+            self.__composite()
+
         #draw panel
-        DISPLAY.blit(panel, self.__panel_rect)
+        render_queue.push(Layer.PANEL, self.__surf, self.__panel_rect)
 
-        #draw medal shadow
-        panel.blit(m_shadow, self.__mshadow_rect)
+    def __composite(self):
+        #make text graphic
+        self.__text_surf = surface_registry.track(font_s.render(self.text, False, (197, 197, 197)), 'panel text')
+        self.__text_rect = self.__text_surf.get_rect()
+        self.__text_rect.center = self.__text_local_pos
 
-        #draw medal        
-        panel.blit(self.medal, self.__medal_rect)
+        #start from a clean panel (NOTE the panel asset itself is never drawn onto)
+        surf = panel.get().copy()
 
-        #draw text
-        panel.blit(self.__text_surf, self.__text_rect)
+        #draw medal shadow, medal & text
+        surf.blits((
+            (m_shadow.get(), self.__mshadow_rect),
+            (self.medal.get(), self.__medal_rect),
+            (self.__text_surf, self.__text_rect)
+        ), doreturn = False)
 
         #draw new best if applies
         if self.is_new_best:
-            panel.blit(new_best, self.__nbest_rect)
+            surf.blit(new_best.get(), self.__nbest_rect)
+
+        self.__surf = surface_registry.track(surf, 'game over panel')
 
 
 game_over_panel = GameOverPanel()
@@ -248,14 +846,16 @@ blocked_spawn = -1 #which lane is blocked from spawning enemies? should be a val
 class Obstacle:    
     texture: Surface = None
     hitbox: Rect = None
+    asset_index = -1 #index of texture in obstacle_assets (for telemetry)
     
     pos: Vector2 = None
     speed = 300
 
     __drop_shadow_rect: Rect = None
 
-    def __init__(self, texture: Surface, start_pos: Vector2) -> None:
-        self.texture = texture.copy()
+    def __init__(self, texture: Surface, start_pos: Vector2, asset_index = -1) -> None:
+        self.texture = texture #NOTE shared with obstacle_assets, never draw onto it!
+        self.asset_index = asset_index
         self.hitbox = texture.get_rect()
 
         self.pos = Vector2(start_pos)
@@ -281,15 +881,26 @@ class Obstacle:
         self.pos.y += (self.speed + (speed - base_speed)) * DELTA_TIME #y pos vel increment is obstacle base speed (300) + the difference between current game speed and base game speed
         self.hitbox.center = self.pos
 
-    def draw(self) -> None:        
-        # #draw hitbox --NOTE for debugging
-        # pygame.draw.rect(DISPLAY, (0, 0, 255), self.rect)
-        
-        #drawing (drop shadow)
-        DISPLAY.blit(shadow, self.__drop_shadow_rect)
+    def snapshot(self) -> tuple:
+        """
+        immutable draw state of this obstacle: (texture, drop shadow topleft, texture topleft)
+        """
+
+        return (self.texture, self.__drop_shadow_rect.topleft, self.hitbox.topleft)
+
+def draw_obstacles(obstacle_snaps) -> None:
+    """
+    draws obstacles from their snapshots (see Obstacle.snapshot)
+    """
 
-        #drawing (texture)
-        DISPLAY.blit(self.texture, self.hitbox)
+    # #draw hitbox --NOTE for debugging
+    # pygame.draw.rect(DISPLAY, (0, 0, 255), self.rect)
+
+    #drawing (drop shadows)
+    render_queue.extend(Layer.OBSTACLE_SHADOW, [(shadow, o[1]) for o in obstacle_snaps])
+
+    #drawing (textures)
+    render_queue.extend(Layer.OBSTACLE, [(o[0], o[2]) for o in obstacle_snaps])
 
 def randint_exclude(a, b, e):
     """
@@ -306,13 +917,20 @@ def instantiate_obstacle() -> None:
     creates a moving obstacle
     """
 
+    asset_index = randint(0, len(obstacle_assets) - 1)
+    lane = randint_exclude(0, len(obstacle_spawns) - 1, blocked_spawn)
+
     obstacles.append(
         Obstacle(
-            obstacle_assets[randint(0, len(obstacle_assets) - 1)],
-            obstacle_spawns[randint_exclude(0, len(obstacle_spawns) - 1, blocked_spawn)]
+            obstacle_assets[asset_index],
+            obstacle_spawns[lane],
+            asset_index
         )
     )
 
+    if TELEMETRY:
+        telemetry_log.log(telemetry.Event.SPAWN, lane, asset_index)
+
 # --- Spider --- 
 
 spider_spawn_ticks = 25 #ticks it takes for spider to peek
@@ -342,7 +960,7 @@ class Spider:
     __outline: Surface = None
 
     def __init__(self, texture = spider, start_lane = 1) -> None:
-        self.texture = texture.copy()
+        self.texture = texture #NOTE shared with the asset, never draw onto it!
         self.hitbox = Rect(0, 0, self.texture.get_width() + self.hitbox_fix, self.texture.get_height() + self.hitbox_fix)
         
         #set vertical positions for different spider states
@@ -372,6 +990,10 @@ class Spider:
         
         self.__outline = mask_surf_pixels.make_surface()
 
+        #outline never changes, so its colorkey only needs setting once
+        self.__outline.set_colorkey((0, 0, 0))
+        self.__outline = surface_registry.track(self.__outline, 'spider outline')
+
     def reset(self) -> None:                        
         #reset state
         self.state = 0
@@ -385,17 +1007,13 @@ class Spider:
 
     #NOTE that drawing the outline is computationally expensive!
     def draw_outline(self, pos):
-        #rotate outline surface
-        c_outline = self.__outline.copy()
-        
-        #set outline colorkey (must do this every time we modify it)
-        c_outline.set_colorkey((0, 0, 0))
-                
         #draw outline (we shift it towards every direction to give outline effect)
-        DISPLAY.blit(c_outline, (pos[0] - self.outline_width, pos[1]))
-        DISPLAY.blit(c_outline, (pos[0] + self.outline_width, pos[1]))
-        DISPLAY.blit(c_outline, (pos[0], pos[1] - self.outline_width))
-        DISPLAY.blit(c_outline, (pos[0], pos[1] + self.outline_width))
+        render_queue.extend(Layer.SPIDER_OUTLINE, (
+            (self.__outline, (pos[0] - self.outline_width, pos[1])),
+            (self.__outline, (pos[0] + self.outline_width, pos[1])),
+            (self.__outline, (pos[0], pos[1] - self.outline_width)),
+            (self.__outline, (pos[0], pos[1] + self.outline_width))
+        ))
 
     def update(self) -> None:       
         #position spider 
@@ -424,18 +1042,19 @@ class Spider:
         #update rect (NOTE this isn't used for drawing, it's used for collision!)
         self.hitbox.center = self.pos
     
-    def draw(self) -> None:
+    def draw(self, pos) -> None:
         #center texture around pos                
         texture_rect = self.texture.get_rect()
-        texture_rect.center = self.pos
+        texture_rect.center = pos
         
         #draw outline
         self.draw_outline(texture_rect.topleft)
 
         #draw texture
-        DISPLAY.blit(self.texture, texture_rect)
+        render_queue.push(Layer.SPIDER, self.texture, texture_rect)
 
 spider = Spider()
+startup.step('spider built')
 
 def spider_time(spider = spider):
     global blocked_spawn
@@ -445,16 +1064,22 @@ def spider_time(spider = spider):
         spider.current_lane = randint(0, 2)
         if spider.current_lane == 1: #0 represents left, 1 center, 2 right
             blocked_spawn = 1 #block enemies from spawning at the center if spider goes here, this is more fair!
-        s_peek.play()
+        s_peek.get().play()
+        if TELEMETRY:
+            telemetry_log.log(telemetry.Event.SPIDER, spider.state, spider.current_lane)
         return spider_ticks_t + spider_peek_ticks
     elif spider.state == 1:
         spider.state = 2
-        s_attack.play()
+        s_attack.get().play()
+        if TELEMETRY:
+            telemetry_log.log(telemetry.Event.SPIDER, spider.state, spider.current_lane)
         return spider_ticks_t + spider_attack_ticks
     else:
         spider.state = 0
         blocked_spawn = -1 #reset blocked obstacle spawn to none
-        s_hide.play()
+        s_hide.get().play()
+        if TELEMETRY:
+            telemetry_log.log(telemetry.Event.SPIDER, spider.state, spider.current_lane)
         return spider_ticks_t + spider_spawn_ticks
 
 # --- Player ---
@@ -486,7 +1111,7 @@ class Player:
     __outline: Surface = None
 
     def __init__(self, texture = player, start_lane = 1) -> None:
-        self.texture = texture.copy()
+        self.texture = texture #NOTE shared with the asset, never draw onto it!
         self.hitbox = Rect(0, 0, self.texture.get_width() + self.hitbox_fix, self.texture.get_height() + self.hitbox_fix)
 
         self.current_lane = start_lane
@@ -504,6 +1129,7 @@ class Player:
         mask_surf_pixels.replace((255, 255, 255), self.outline_color)
         
         self.__outline = mask_surf_pixels.make_surface()
+        self.__outline = surface_registry.track(self.__outline, 'player outline', static = False) #NOTE rotated every frame
 
     def reset_pos(self) -> None:
         """
@@ -543,6 +1169,9 @@ class Player:
             self.current_lane -= 1
             self.last_direction = Direction.RIGHT
             p_switch.play()
+
+            if TELEMETRY:
+                telemetry_log.log(telemetry.Event.LANE_SWITCH, self.current_lane, -1)
             
             self.__l_pressed = True
         
@@ -554,6 +1183,9 @@ class Player:
             self.current_lane += 1
             self.last_direction = Direction.LEFT
             p_switch.play()
+
+            if TELEMETRY:
+                telemetry_log.log(telemetry.Event.LANE_SWITCH, self.current_lane, 1)
             
             self.__r_pressed = True
 
@@ -579,56 +1211,64 @@ class Player:
                     state = GameState.GAME_OVER
                     p_crash.play()
 
+                    if TELEMETRY:
+                        telemetry_log.log(telemetry.Event.CRASH, obstacle.asset_index if self.hitbox.colliderect(obstacle.hitbox) else -1, self.current_lane)
+
+                    #one crash is enough (NOTE otherwise a spider crash is logged once per obstacle on screen)
+                    break
+
         #input
         self.get_input()
     
     #NOTE that drawing the outline is computationally expensive!
-    def draw_outline(self, pos):
+    def draw_outline(self, pos, rot):
         #rotate outline surface
-        r_outline = pygame.transform.rotate(self.__outline, self.rot)
+        r_outline = surface_registry.transient(pygame.transform.rotate(self.__outline, rot))
         
         #set outline colorkey (must do this every time we modify it)
         r_outline.set_colorkey((0, 0, 0))
                 
         #draw outline (we shift it towards every direction to give outline effect)
-        DISPLAY.blit(r_outline, (pos[0] - self.outline_width, pos[1]))
-        DISPLAY.blit(r_outline, (pos[0] + self.outline_width, pos[1]))
-        DISPLAY.blit(r_outline, (pos[0], pos[1] - self.outline_width))
-        DISPLAY.blit(r_outline, (pos[0], pos[1] + self.outline_width))
-
-    def draw(self) -> None:
+        render_queue.extend(Layer.PLAYER_OUTLINE, (
+            (r_outline, (pos[0] - self.outline_width, pos[1])),
+            (r_outline, (pos[0] + self.outline_width, pos[1])),
+            (r_outline, (pos[0], pos[1] - self.outline_width)),
+            (r_outline, (pos[0], pos[1] + self.outline_width))
+        ))
+
+    def draw(self, pos, rot) -> None:
         # #draw hitbox --NOTE for debugging
         # pygame.draw.rect(DISPLAY, (0, 255, 0), self.rect)
         
         #rotate dropshadow
-        r_shadow = pygame.transform.rotate(shadow, self.rot) #NOTE --move shadow_r to classvar?
+        r_shadow = surface_registry.transient(pygame.transform.rotate(shadow, rot)) #NOTE --move shadow_r to classvar?
         
         #center rotated dropshadow rect
         r_shadow_rect = r_shadow.get_rect()
-        r_shadow_rect.center = self.pos
+        r_shadow_rect.center = pos
         
         #rotate texture
-        r_texture = pygame.transform.rotate(self.texture, self.rot) #NOTE --move texture_r to classvar?
+        r_texture = surface_registry.transient(pygame.transform.rotate(self.texture, rot)) #NOTE --move texture_r to classvar?
         
         #center rotated texture rect
         r_texture_rect = r_texture.get_rect()
-        r_texture_rect.center = self.pos
+        r_texture_rect.center = pos
 
         #draw dropshadow
-        DISPLAY.blit(r_shadow, r_shadow_rect)
+        render_queue.push(Layer.PLAYER_SHADOW, r_shadow, r_shadow_rect)
         
         #draw outline
-        self.draw_outline(r_texture_rect.topleft)
+        self.draw_outline(r_texture_rect.topleft, rot)
 
         #draw texture
-        DISPLAY.blit(r_texture, r_texture_rect)
+        render_queue.push(Layer.PLAYER, r_texture, r_texture_rect)
 
 player = Player()
+startup.step('player built')
 
 # GAME LOOP ----------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 #temp, delete || move later
-s_text = str(score)
 s_last_text = None
 
 st_outl_width = 5
@@ -636,20 +1276,16 @@ st_outl_width = 5
 st: Surface = None
 st_outl: Surface = None
 st_rect: Rect = None
+st_pos = None
 
-while True:
-    #pygame opening
-    if pygame.key.get_pressed()[pygame.K_ESCAPE]:
-        sys.exit()
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
+def simulate() -> None:
+    """
+    advances the game by DELTA_TIME; every game state change happens in here
+    """
 
-    DELTA_TIME = CLOCK.tick() / 1000
-    DISPLAY.fill((0, 0, 0))
-    
-    #draw road
+    global state, reset, timer, ticks, score, speed, road_vel, spawn_ticks_t, score_ticks_t, speed_ticks_t, spider_ticks_t
+
+    #position road rects (used to wrap road around)
     road_rect_a.center = road_pos_a
     road_rect_b.center = road_pos_b
     
@@ -666,44 +1302,18 @@ while True:
     if road_rect_b.y >= DISPLAY_SIZE[1]:
         road_pos_b.y -= road_dsp
 
-    DISPLAY.blit(road, road_rect_a)
-    DISPLAY.blit(road, road_rect_b)
-
     if state != GameState.GAME_OVER:
         #if game is not over update player and spider
         player.update()
         spider.update()
-        
-
-    #always draw obstacles in obstacles list
-    for obstacle in obstacles:
-        obstacle.draw()
-    
-    #always draw player and spider
-    player.draw()
-    spider.draw()
 
     if state == GameState.IDLE:
         if len(obstacles) != 0:
             obstacles.clear()
 
-        #draw logo
-        logo_rect = logo.get_rect()
-        logo_rect.center = (DISPLAY_SIZE[0] / 2, 150)
-        
         #reset spider, TODO happens only once
         spider.reset()
 
-        DISPLAY.blit(logo, logo_rect)
-
-        #show highscore if we have one
-        if high_score != None:
-            hs_text = font_s.render('High Score: {H}'.format(H=high_score), False, (197, 197, 197))
-            hs_text_rect = hs_text.get_rect()
-            hs_text_rect.center = (DISPLAY_SIZE[0] / 2, 310)
-
-            DISPLAY.blit(hs_text, hs_text_rect)
-
     if state == GameState.GAME_ON:
         #allow game values to be reset again
         if reset:
@@ -712,33 +1322,6 @@ while True:
         #update obstacles
         for obstacle in obstacles:
             obstacle.update()
-        
-        #update score txt
-        s_text = str(score)
-
-        #remake score txt graphic if score txt changed
-        if s_text != s_last_text:
-            s_last_text = s_text
-
-            #make score txt
-            st = font.render(s_text, False, (255, 255, 255))
-
-            #make score txt outline
-            st_outl = font.render(s_text, False, (25, 25, 25))
-            
-            #maek score txt rect
-            st_rect = st.get_rect()
-            st_rect.center = (DISPLAY_SIZE[0] / 2, 65)
-            st_pos = st_rect.topleft
-        
-        #draw score txt outline
-        DISPLAY.blit(st_outl, (st_pos[0] - st_outl_width, st_pos[1]))
-        DISPLAY.blit(st_outl, (st_pos[0] + st_outl_width, st_pos[1]))
-        DISPLAY.blit(st_outl, (st_pos[0], st_pos[1] - st_outl_width))
-        DISPLAY.blit(st_outl, (st_pos[0], st_pos[1] + st_outl_width))
-
-        #draw score txt
-        DISPLAY.blit(st, st_rect)
     
         #update ticks
         if timer < 0.5:
@@ -748,6 +1331,10 @@ while True:
             ticks += 1
             timer = 0
 
+            #sample score & speed every tick
+            if TELEMETRY:
+                telemetry_log.log(telemetry.Event.SAMPLE, score, speed)
+
         #spawn obstacles
         if ticks == spawn_ticks_t:
             instantiate_obstacle()
@@ -783,18 +1370,295 @@ while True:
             spider_ticks_t = spider_spawn_ticks
 
             reset = True
+
+        #get restart input
+        if pygame.key.get_pressed()[pygame.K_r]:
+            state = GameState.IDLE
+
+# --- Snapshots ---
+
+THREADED = '--threaded' in sys.argv #simulate on its own thread at a fixed rate; the main thread only draws the latest snapshot
+SIM_RATE = 120 #simulation steps per second in threaded mode
+SNAPSHOT_WAIT = 2 / SIM_RATE #longest the renderer waits for a new snapshot before counting a duplicated frame (and handling events again)
+
+class Snapshot(NamedTuple):
+    """
+    immutable copy of everything drawing needs from one simulation step
+    """
+
+    seq: int #simulation step it was taken at (used to spot dropped frames)
+    published: float #perf_counter time it was taken at
+    state: GameState
+    road_y: tuple #center y of road a & b
+    player_pos: tuple
+    player_rot: float
+    spider_pos: tuple
+    obstacles: tuple #see Obstacle.snapshot
+    score: int
+    high_score: int
+
+def take_snapshot(seq = 0) -> Snapshot:
+    """
+    snapshots the current game state
+    """
+
+    return Snapshot(
+        seq = seq,
+        published = time.perf_counter(),
+        state = state,
+        road_y = (road_pos_a.y, road_pos_b.y),
+        player_pos = (player.pos.x, player.pos.y),
+        player_rot = player.rot,
+        spider_pos = (spider.pos.x, spider.pos.y),
+        obstacles = tuple(obstacle.snapshot() for obstacle in obstacles),
+        score = score,
+        high_score = high_score
+    )
+
+class SnapshotBuffer:
+    """
+    double buffer between the simulation & render threads; the simulation fills the back slot and swaps, the renderer waits for the front one to be newer than what it last drew
+    """
+
+    error = None #set if the simulation thread died
+
+    __buffers = None
+    __front = 0
+    __cond = None
+
+    def __init__(self) -> None:
+        self.__buffers = [None, None]
+        self.__front = 0
+        self.__cond = threading.Condition()
+
+    def publish(self, snap: Snapshot) -> None:
+        back = 1 - self.__front
+        self.__buffers[back] = snap
+
+        with self.__cond:
+            self.__front = back
+            self.__cond.notify()
+
+    def fail(self, error: Exception) -> None:
+        with self.__cond:
+            self.error = error
+            self.__cond.notify()
+
+    def wait_newer(self, seq, timeout) -> Snapshot:
+        """
+        waits up to timeout secs for a snapshot newer than seq; None if there's none yet (or the simulation failed)
+        """
+
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.error != None or self.__buffers[self.__front].seq > seq, timeout)
+
+            snap = self.__buffers[self.__front]
+            return snap if self.error == None and snap.seq > seq else None
+
+def simulation_thread(snapshots: SnapshotBuffer) -> None:
+    """
+    threaded mode: steps the simulation at SIM_RATE and publishes a snapshot after every step
+    """
+
+    seq = 0
+    next_step = time.perf_counter()
+
+    try:
+        while True:
+            simulate()
+
+            seq += 1
+            snapshots.publish(take_snapshot(seq))
+
+            #wait for the next step; if we fell behind don't try to catch up, just carry on from now
+            next_step += DELTA_TIME
+            delay = next_step - time.perf_counter()
+
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_step = time.perf_counter()
+
+    except Exception as e:
+        #let the render loop know, otherwise it would keep presenting the last snapshot forever
+        traceback.print_exc()
+        snapshots.fail(e)
+
+def draw(snap: Snapshot) -> None:
+    """
+    draws a snapshot (NOTE may run on a different thread than the simulation, so only snap & assets are read here!)
+    """
+
+    global s_last_text, st, st_outl, st_rect, st_pos
+
+    #draw road
+    render_queue.push(Layer.ROAD, road, road.get_rect(center = (DISPLAY_SIZE[0] / 2, snap.road_y[0])))
+    render_queue.push(Layer.ROAD, road, road.get_rect(center = (DISPLAY_SIZE[0] / 2, snap.road_y[1])))
+
+    #always draw obstacles in obstacles list
+    draw_obstacles(snap.obstacles)
+    
+    #always draw player and spider
+    player.draw(snap.player_pos, snap.player_rot)
+    spider.draw(snap.spider_pos)
+
+    if snap.state == GameState.IDLE:
+        #draw logo
+        logo_rect = logo.get_rect()
+        logo_rect.center = (DISPLAY_SIZE[0] / 2, 150)
+
+        render_queue.push(Layer.UI, logo, logo_rect)
+
+        #show highscore if we have one
+        if snap.high_score != None:
+            hs_text = surface_registry.transient(font_s.render('High Score: {H}'.format(H=snap.high_score), False, (197, 197, 197)))
+            hs_text_rect = hs_text.get_rect()
+            hs_text_rect.center = (DISPLAY_SIZE[0] / 2, 310)
+
+            render_queue.push(Layer.UI, hs_text, hs_text_rect)
+
+    if snap.state == GameState.GAME_ON:
+        #update score txt
+        s_text = str(snap.score)
+
+        #remake score txt graphic if score txt changed
+        if s_text != s_last_text:
+            s_last_text = s_text
+
+            #make score txt
+            st = surface_registry.track(font.render(s_text, False, (255, 255, 255)), 'score text')
+
+            #make score txt outline
+            st_outl = surface_registry.track(font.render(s_text, False, (25, 25, 25)), 'score text outline')
+            
+            #maek score txt rect
+            st_rect = st.get_rect()
+            st_rect.center = (DISPLAY_SIZE[0] / 2, 65)
+            st_pos = st_rect.topleft
         
+        #draw score txt outline
+        render_queue.extend(Layer.TEXT_OUTLINE, (
+            (st_outl, (st_pos[0] - st_outl_width, st_pos[1])),
+            (st_outl, (st_pos[0] + st_outl_width, st_pos[1])),
+            (st_outl, (st_pos[0], st_pos[1] - st_outl_width)),
+            (st_outl, (st_pos[0], st_pos[1] + st_outl_width))
+        ))
+
+        #draw score txt
+        render_queue.push(Layer.UI, st, st_rect)
+
+    if snap.state == GameState.GAME_OVER:
         #draw game over
-        go_rect = game_over.get_rect()
+        go_rect = game_over.get().get_rect()
         go_rect.center = (DISPLAY_SIZE[0] / 2, 150)
         
         #draw game over panel
         game_over_panel.draw()
-        DISPLAY.blit(game_over, go_rect)
+        render_queue.push(Layer.UI, game_over.get(), go_rect)
 
-        #get restart input
-        if pygame.key.get_pressed()[pygame.K_r]:
-            state = GameState.IDLE
+last_state = state #used to catch gamestate changes for gc scheduling, frame stats & lazy asset prefetching
+
+if THREADED:
+    DELTA_TIME = 1 / SIM_RATE
+
+    snapshots = SnapshotBuffer()
+    snapshots.publish(take_snapshot())
+
+    threading.Thread(target = simulation_thread, args = (snapshots,), name = 'simulation', daemon = True).start()
+
+first_frame = True #used to end the startup trace once the first game frame is up
+drawn_seq = -1 #seq of the last snapshot drawn (threaded mode)
+
+last_frame_start = time.perf_counter() #used to time frames
+
+while True:
+    #pygame opening
+    if pygame.key.get_pressed()[pygame.K_ESCAPE]:
+        sys.exit()
+    
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            sys.exit()
+
+        #print surface memory & formats on demand
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            surface_registry.report()
+
+    #in threaded mode only draw once the simulation published something new (time out now and then to keep handling events)
+    if THREADED:
+        snap = snapshots.wait_newer(drawn_seq, SNAPSHOT_WAIT)
+
+        if snapshots.error != None:
+            print_warning("simulation thread crashed, quitting!")
+            sys.exit(1)
+
+        if snap == None:
+            #the simulation fell behind, the last snapshot stays up for another frame
+            if FRAME_STATS and last_state == GameState.GAME_ON:
+                frame_stats.duplicated += 1
+
+            continue
+
+        drawn_seq = snap.seq
+
+    frame_start = time.perf_counter()
+    frame_dt = frame_start - last_frame_start
+    last_frame_start = frame_start
+
+    if not THREADED:
+        DELTA_TIME = frame_dt
+        simulate()
+        snap = take_snapshot()
+
+    DISPLAY.fill((0, 0, 0))
+    draw(snap)
+
+    #submit everything drawn this frame
+    render_queue.flush()
+    surface_registry.end_frame()
+
+    #frame stats only cover gameplay, that's where hitches matter
+    if FRAME_STATS:
+        if last_state == GameState.GAME_ON:
+            frame_stats.add_frame(frame_dt, render_queue.commands, render_queue.batches, render_queue.area)
+
+            if THREADED:
+                frame_stats.add_snapshot(snap.seq, snap.published)
+
+        elif snap.state == GameState.GAME_ON:
+            frame_stats.clear()
+
+    #start loading rarely used assets once a game starts, they'll be ready long before they're needed
+    if snap.state != last_state and snap.state == GameState.GAME_ON:
+        for asset in lazy_assets:
+            asset.prefetch()
 
     #pygame closing
-    pygame.display.update()
\ No newline at end of file
+    pygame.display.update()
+
+    #gc scheduling (after the frame is presented, so a collection can't hold it back)
+    if GC_SCHEDULE:
+        if snap.state != last_state:
+            gc_state_change(snap.state)
+        elif snap.state == GameState.GAME_ON:
+            gc_schedule_frame(time.perf_counter() - frame_start)
+
+    #report a round once it's over (NOTE after gc scheduling, so the game over collection's pause is in the report)
+    if FRAME_STATS and last_state == GameState.GAME_ON and snap.state == GameState.GAME_OVER:
+        frame_stats.report()
+
+    last_state = snap.state
+
+    if first_frame:
+        first_frame = False
+        startup.step('first game frame')
+
+        #everything loaded so far lives for the whole game; move it out of the gc's reach
+        #NOTE done after the first game frame is up so it doesn't add to time to first frame
+        if GC_SCHEDULE:
+            gc.collect()
+            gc.freeze()
+            startup.step('gc freeze')
+
+        if STARTUP_TRACE:
+            startup.report()
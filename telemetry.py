@@ -0,0 +1,208 @@
+import atexit
+import glob
+import json
+import os
+import struct
+import threading
+import time
+
+from enum import IntEnum
+
+# --- Records ---
+
+class Event(IntEnum):
+    """
+    telemetry event types; what a & b hold depends on the event
+    """
+
+    SPAWN = 0 #a = spawn lane, b = obstacle asset index
+    LANE_SWITCH = 1 #a = new lane, b = direction (-1 left, 1 right)
+    SPIDER = 2 #a = new spider state (0 hidden, 1 peeking, 2 attacking), b = spider lane
+    CRASH = 3 #a = obstacle asset index hit (-1 for the spider), b = player lane
+    SAMPLE = 4 #a = score, b = speed
+
+RECORD = struct.Struct('<dIii') #time (secs since session start), event, a, b
+
+NUMPY_DTYPE = [('t', '<f8'), ('event', '<u4'), ('a', '<i4'), ('b', '<i4')] #matches RECORD
+
+# --- Writer ---
+
+class TelemetryWriter:
+    """
+    appends fixed-size records into an in-memory ring buffer; a background thread flushes them in bulk to rotated session files.
+    log() never blocks or touches the disk: if the buffer is full the record is dropped (and counted)
+    """
+
+    session = None
+    directory = None
+    fmt = 'bin' #'bin' or 'jsonl'
+
+    dropped = 0 #records lost to a full buffer
+
+    __buf = None
+    __capacity = 0
+    __head = 0 #records written (only the logging thread moves this)
+    __tail = 0 #records flushed (only the flush thread moves this)
+    __start = 0
+
+    __file = None
+    __file_bytes = 0
+    __part = 0
+
+    __last_error = None #last flush error reported, so a failing disk isn't reported every flush
+
+    __sessions = 0 #writers started by this process, keeps their session ids apart
+
+    def __init__(self, directory = 'telemetry', fmt = 'bin', capacity = 1 << 16, flush_interval = 0.5, max_file_bytes = 1 << 20) -> None:
+        self.directory = directory
+        self.fmt = fmt
+        #NOTE pid & per-process count keep sessions started in the same second apart
+        TelemetryWriter.__sessions += 1
+        self.session = '{T}-{P}-{N}'.format(T = time.strftime('%Y%m%d-%H%M%S'), P = os.getpid(), N = TelemetryWriter.__sessions)
+
+        self.__buf = bytearray(capacity * RECORD.size)
+        self.__capacity = capacity
+        self.__start = time.perf_counter()
+
+        self.__flush_interval = flush_interval
+        self.__max_file_bytes = max_file_bytes
+        self.__closed = threading.Event()
+        self.__flush_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok = True)
+
+        self.__thread = threading.Thread(target = self.__run, name = 'telemetry', daemon = True)
+        self.__thread.start()
+
+        #whatever is still buffered gets written on exit
+        atexit.register(self.close)
+
+    def log(self, event: Event, a = 0, b = 0) -> None:
+        """
+        hot path: one pack_into on a preallocated buffer
+        """
+
+        head = self.__head
+
+        if head - self.__tail >= self.__capacity:
+            self.dropped += 1
+            return
+
+        RECORD.pack_into(self.__buf, (head % self.__capacity) * RECORD.size, time.perf_counter() - self.__start, event, a, b)
+        self.__head = head + 1
+
+    def flush(self) -> None:
+        """
+        writes every buffered record out to the current session file
+        """
+
+        with self.__flush_lock:
+            head = self.__head
+            tail = self.__tail
+
+            if head == tail:
+                return
+
+            #copy pending records out in (at most) two slices, the ring may wrap around
+            start = (tail % self.__capacity) * RECORD.size
+            end = (head % self.__capacity) * RECORD.size
+
+            if end > start:
+                data = bytes(self.__buf[start:end])
+            else:
+                data = bytes(self.__buf[start:]) + bytes(self.__buf[:end])
+
+            self.__write(data)
+
+            #only let go of the records once they're on disk, a failed write keeps them buffered for the next flush
+            self.__tail = head
+
+    def close(self) -> None:
+        if self.__closed.is_set():
+            return
+
+        self.__closed.set()
+        self.__thread.join()
+
+        self.__try_flush()
+
+        if self.__file != None:
+            self.__file.close()
+            self.__file = None
+
+        if self.dropped != 0:
+            print("[!] telemetry dropped {N} records, buffer was full".format(N = self.dropped))
+
+    def __run(self) -> None:
+        while not self.__closed.wait(self.__flush_interval):
+            self.__try_flush()
+
+    def __try_flush(self) -> None:
+        """
+        flush that reports disk errors instead of raising them, telemetry must never take the game (or the flush thread) down
+        """
+
+        try:
+            self.flush()
+            self.__last_error = None
+
+        except OSError as e:
+            if str(e) != self.__last_error:
+                self.__last_error = str(e)
+                print("[!] telemetry flush failed, records stay buffered: {E}".format(E = e))
+
+    def __write(self, data: bytes) -> None:
+        if self.fmt == 'jsonl':
+            data = ''.join(
+                json.dumps({'t': t, 'event': Event(e).name, 'a': a, 'b': b}) + '\n' for t, e, a, b in RECORD.iter_unpack(data)
+            ).encode()
+
+        #rotate to a new part once the current one is full
+        if self.__file == None or self.__file_bytes >= self.__max_file_bytes:
+            if self.__file != None:
+                self.__file.close()
+
+            self.__file = None
+            self.__part += 1 #NOTE bumped before opening, so a part name that's taken is skipped on the next try
+            self.__file = open(session_path(self.directory, self.session, self.__part, self.fmt), 'xb') #never overwrite another session's files
+            self.__file_bytes = 0
+
+        self.__file.write(data)
+        self.__file.flush()
+        self.__file_bytes += len(data)
+
+def session_path(directory, session, part, fmt = 'bin') -> str:
+    return os.path.join(directory, '{S}.{P:03d}.{F}'.format(S = session, P = part, F = fmt))
+
+# --- Reader ---
+
+def list_sessions(directory = 'telemetry') -> list:
+    """
+    names of all sessions logged in a directory, oldest first
+    """
+
+    return sorted({os.path.basename(path).split('.')[0] for path in glob.glob(os.path.join(directory, '*.*.*'))})
+
+def load_session(session, directory = 'telemetry'):
+    """
+    loads every part of a session (binary or jsonl) into one numpy structured array with fields t, event, a & b.
+    numpy is only needed here, not by the game itself
+    """
+
+    import numpy as np
+
+    parts = sorted(glob.glob(os.path.join(directory, '{S}.*.*'.format(S = session))))
+    if len(parts) == 0:
+        raise FileNotFoundError("no telemetry found for session {S} in {D}".format(S = session, D = directory))
+
+    arrays = []
+    for path in parts:
+        if path.endswith('.jsonl'):
+            with open(path, 'r') as f:
+                rows = [json.loads(line) for line in f if line.strip() != '']
+
+            arrays.append(np.array([(r['t'], Event[r['event']], r['a'], r['b']) for r in rows], dtype = NUMPY_DTYPE))
+        else:
+            arrays.append(np.fromfile(path, dtype = NUMPY_DTYPE))
+
+    return np.concatenate(arrays)